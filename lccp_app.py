@@ -1,23 +1,30 @@
+import altair as alt
 import streamlit as st
+import numpy as np
 import pandas as pd
-from dataclasses import dataclass
+from typing import NamedTuple
+
+from lccp_model import (
+    calc_direct_kernel,
+    calc_indirect_kernel,
+    direct_cf,
+    indirect_cf,
+)
 
 # ----------------------------
 # CONFIG / DEFAULT CONSTANTS
 # ----------------------------
 DEFAULT_LIFETIME_YEARS = 15
-DEFAULT_COOLING_HOURS = 1000
-DEFAULT_HEATING_HOURS = 600
 DEFAULT_GRID_KGCO2_PER_KWH = 0.38
 EMBODIED_KGCO2_PER_KG_MATERIAL = 5
 DEFAULT_REFRIG_GWP = 675.0   # e.g. R-32 placeholder
+# cooling/heating hours live in lccp_model next to the kernels that use them
 
 
 # ----------------------------
-# DATA CLASSES
+# INPUT TYPES
 # ----------------------------
-@dataclass
-class SystemInputs:
+class SystemInputs(NamedTuple):
     capacity_btuh: float
     seer2: float
     hspf2: float
@@ -28,8 +35,7 @@ class SystemInputs:
     material_weight_kg: float
 
 
-@dataclass
-class DirectCFInputs:
+class DirectCFInputs(NamedTuple):
     reclaimed_per_unit_pct: float
     unit_volume_cuft: float
     manufactured_in_usa: bool
@@ -37,8 +43,7 @@ class DirectCFInputs:
     refrigerant_safety_class: str
 
 
-@dataclass
-class IndirectCFInputs:
+class IndirectCFInputs(NamedTuple):
     compressor_type: str
     demand_flex: bool
     connected_thermostat: bool
@@ -47,99 +52,198 @@ class IndirectCFInputs:
 # ----------------------------
 # CORE CALCS
 # ----------------------------
+# in memory only: a disk entry is keyed on this wrapper's source, not on
+# the formulas in lccp_model, so it would outlive a model change, and the
+# ufunc call is cheaper than reading the entry back anyway
+@st.cache_data(show_spinner=False, max_entries=128)
+def _calc_direct(charge: float,
+                 leak_pct: float,
+                 eol_pct: float,
+                 reclaimed_pct: float,
+                 mat_wt: float,
+                 gwp: float,
+                 lifetime: int,
+                 embodied: float) -> float:
+    return float(calc_direct_kernel(charge, leak_pct, eol_pct, reclaimed_pct,
+                                    mat_wt, gwp, lifetime, embodied))
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _calc_indirect(cap: float,
+                   seer2: float,
+                   hspf2: float,
+                   lifetime: int,
+                   grid_factor: float) -> float:
+    return float(calc_indirect_kernel(cap, seer2, hspf2, lifetime, grid_factor))
+
+
 def calc_baseline_direct(system: SystemInputs,
                          refrigerant_gwp: float,
                          lifetime_years: int,
                          embodied_factor: float) -> float:
-    charge = system.refrigerant_charge_kg
-    annual_leak_frac = system.annual_leak_rate_pct / 100.0
-    eol_loss_frac = system.eol_loss_pct / 100.0
-
-    # annual/leak
-    annual_leak_kg = charge * annual_leak_frac
-    total_leak_kg = annual_leak_kg * lifetime_years
-
-    remaining_kg = max(charge - total_leak_kg, 0)
-    eol_leak_kg = remaining_kg * eol_loss_frac
-
-    refrigerant_emissions = (total_leak_kg + eol_leak_kg) * refrigerant_gwp
-
-    # credit for reclaimed refrigerant used at initial charge
-    reclaimed_frac = system.reclaimed_refrigerant_pct / 100.0
-    reclaimed_credit = charge * reclaimed_frac * refrigerant_gwp * (-0.5)
-
-    # embodied for outdoor unit
-    embodied = system.material_weight_kg * embodied_factor
-
-    return refrigerant_emissions + reclaimed_credit + embodied
+    return _calc_direct(system.refrigerant_charge_kg,
+                        system.annual_leak_rate_pct,
+                        system.eol_loss_pct,
+                        system.reclaimed_refrigerant_pct,
+                        system.material_weight_kg,
+                        refrigerant_gwp,
+                        lifetime_years,
+                        embodied_factor)
 
 
 def calc_baseline_indirect(system: SystemInputs,
                            lifetime_years: int,
                            grid_factor: float) -> float:
-    cap = system.capacity_btuh
-    cooling_kwh = (cap * DEFAULT_COOLING_HOURS) / (system.seer2 * 1000.0)
-    heating_kwh = (cap * DEFAULT_HEATING_HOURS) / (system.hspf2 * 1000.0)
+    return _calc_indirect(system.capacity_btuh,
+                          system.seer2,
+                          system.hspf2,
+                          lifetime_years,
+                          grid_factor)
+
+
+# sweep path for what-if tables: the kernels are ufuncs, so arguments
+# broadcast against each other and any mix of scalars and arrays works
+def calc_baseline_direct_vec(charge, leak_pct, eol_pct, reclaimed_pct,
+                             mat_wt, gwp, lifetime, embodied) -> np.ndarray:
+    return np.asarray(calc_direct_kernel(charge, leak_pct, eol_pct, reclaimed_pct,
+                                         mat_wt, gwp, lifetime, embodied))
 
-    annual_kwh = cooling_kwh + heating_kwh
-    annual_kgco2 = annual_kwh * grid_factor
-    return annual_kgco2 * lifetime_years
+
+def calc_baseline_indirect_vec(cap, seer2, hspf2, lifetime, grid_factor) -> np.ndarray:
+    return np.asarray(calc_indirect_kernel(cap, seer2, hspf2, lifetime, grid_factor))
 
 
 # ----------------------------
 # CORRECTION FACTORS
 # ----------------------------
 def build_direct_cf(cf: DirectCFInputs) -> float:
-    cf_val = 1.0
-
-    # reclaimed per unit
-    if cf.reclaimed_per_unit_pct >= 50:
-        cf_val *= 0.9
-    elif cf.reclaimed_per_unit_pct >= 20:
-        cf_val *= 0.95
-
-    # unit volume
-    if cf.unit_volume_cuft <= 6:
-        cf_val *= 0.97
-    elif cf.unit_volume_cuft <= 10:
-        cf_val *= 0.99
-
-    # manufactured in USA
-    if cf.manufactured_in_usa:
-        cf_val *= 0.98
-
-    # leak detectors
-    if cf.leak_detectors:
-        cf_val *= 0.95
-
-    # refrigerant safety
-    safety = cf.refrigerant_safety_class.strip().upper()
-    if safety == "2L":
-        cf_val *= 0.995
-    elif safety == "3":
-        cf_val *= 1.01
-
-    return cf_val
+    return direct_cf(cf.reclaimed_per_unit_pct,
+                     cf.unit_volume_cuft,
+                     cf.manufactured_in_usa,
+                     cf.leak_detectors,
+                     cf.refrigerant_safety_class)
 
 
 def build_indirect_cf(cf: IndirectCFInputs) -> float:
-    cf_val = 1.0
+    return indirect_cf(cf.compressor_type,
+                       cf.demand_flex,
+                       cf.connected_thermostat)
 
-    ctype = cf.compressor_type.lower().strip()
-    if ctype.startswith("1"):
-        cf_val *= 1.00
-    elif "2" in ctype:
-        cf_val *= 0.95
-    elif "var" in ctype:
-        cf_val *= 0.90
 
-    if cf.demand_flex:
-        cf_val *= 0.97
+# ----------------------------
+# CACHED OUTPUTS
+# ----------------------------
+# caches the finished Vega-Lite spec rather than the altair object, so a
+# hit skips altair's to_dict() validation and is a cheap dict copy; kept
+# in memory since the spec targets the installed altair's Vega-Lite schema
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_chart(base_direct: float,
+                 adj_direct: float,
+                 base_indirect: float,
+                 adj_indirect: float,
+                 total_lccp: float) -> dict:
+    # five rows don't need a DataFrame; inline records go straight into the spec
+    values = {
+        "Baseline Direct": base_direct,
+        "Adjusted Direct": adj_direct,
+        "Baseline Indirect": base_indirect,
+        "Adjusted Indirect": adj_indirect,
+        "Total LCCP": total_lccp,
+    }
+    chart_data = alt.Data(values=[
+        {"label": label, "kgCO2e": value} for label, value in values.items()
+    ])
+    return alt.Chart(chart_data).mark_bar().encode(
+        x=alt.X("label:N", sort=None, title=None),
+        y=alt.Y("kgCO2e:Q"),
+    ).to_dict()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_csv(cap: float,
+               seer2: float,
+               hspf2: float,
+               charge: float,
+               base_direct: float,
+               adj_direct: float,
+               base_indirect: float,
+               adj_indirect: float,
+               total_lccp: float,
+               direct_cf_mult: float,
+               indirect_cf_mult: float) -> bytes:
+    export_df = pd.DataFrame(
+        {
+            "metric": [
+                "capacity_btuh",
+                "seer2",
+                "hspf2",
+                "refrigerant_charge_kg",
+                "baseline_direct_kgco2e",
+                "adjusted_direct_kgco2e",
+                "baseline_indirect_kgco2e",
+                "adjusted_indirect_kgco2e",
+                "total_lccp_kgco2e",
+                "direct_cf_multiplier",
+                "indirect_cf_multiplier",
+            ],
+            "value": [
+                cap,
+                seer2,
+                hspf2,
+                charge,
+                base_direct,
+                adj_direct,
+                base_indirect,
+                adj_indirect,
+                total_lccp,
+                direct_cf_mult,
+                indirect_cf_mult,
+            ],
+        }
+    )
+    return export_df.to_csv(index=False).encode("utf-8")
+
+
+# sweeps span the same ranges as the corresponding input widgets
+_GRID_SWEEP = np.linspace(0.1, 1.5, 29)
+_LEAK_SWEEP = np.arange(0.0, 31.0)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_grid_sweep_df(system: SystemInputs,
+                         lifetime: int,
+                         adj_direct: float,
+                         indirect_cf_mult: float) -> pd.DataFrame:
+    indirect = calc_baseline_indirect_vec(system.capacity_btuh,
+                                          system.seer2,
+                                          system.hspf2,
+                                          lifetime,
+                                          _GRID_SWEEP)
+    return pd.DataFrame(
+        {"Total LCCP (kgCO2e)": adj_direct + indirect * indirect_cf_mult},
+        index=pd.Index(_GRID_SWEEP, name="Grid emission factor (kgCO2/kWh)"),
+    )
 
-    if cf.connected_thermostat:
-        cf_val *= 0.98
 
-    return cf_val
+@st.cache_data(show_spinner=False, max_entries=64)
+def _build_leak_sweep_df(system: SystemInputs,
+                         refrigerant_gwp: float,
+                         lifetime: int,
+                         embodied_factor: float,
+                         adj_indirect: float,
+                         direct_cf_mult: float) -> pd.DataFrame:
+    direct = calc_baseline_direct_vec(system.refrigerant_charge_kg,
+                                      _LEAK_SWEEP,
+                                      system.eol_loss_pct,
+                                      system.reclaimed_refrigerant_pct,
+                                      system.material_weight_kg,
+                                      refrigerant_gwp,
+                                      lifetime,
+                                      embodied_factor)
+    return pd.DataFrame(
+        {"Total LCCP (kgCO2e)": direct * direct_cf_mult + adj_indirect},
+        index=pd.Index(_LEAK_SWEEP, name="Annual leakage rate (%)"),
+    )
 
 
 # ----------------------------
@@ -156,34 +260,54 @@ def main():
     refrigerant_gwp = st.sidebar.number_input("Refrigerant GWP", 1.0, 4000.0, DEFAULT_REFRIG_GWP, 1.0)
     embodied_factor = st.sidebar.number_input("Embodied factor (kgCO2 per kg material)", 0.1, 20.0, EMBODIED_KGCO2_PER_KG_MATERIAL, 0.1)
 
-    col1, col2 = st.columns(2)
-
-    # System inputs
-    with col1:
-        st.subheader("System Inputs")
-        cap = st.number_input("System capacity (Btuh)", 9000.0, 120000.0, 36000.0, 500.0)
-        seer2 = st.number_input("SEER2", 8.0, 30.0, 15.0, 0.1)
-        hspf2 = st.number_input("HSPF2", 5.0, 14.0, 8.5, 0.1)
-        charge = st.number_input("Refrigerant charge (kg)", 0.5, 15.0, 3.0, 0.1)
-        reclaimed_init = st.slider("Reclaimed refrigerant at initial charge (%)", 0, 100, 0)
-        annual_leak = st.slider("Annual leakage rate (%)", 0, 30, 4)
-        eol_loss = st.slider("End-of-life refrigerant loss (%)", 0, 100, 85)
-        material_wt = st.number_input("Material weight of outdoor unit (kg)", 10.0, 350.0, 140.0, 1.0)
-
-    # Direct CF inputs
-    with col2:
-        st.subheader("Direct CF Features")
-        d_reclaimed = st.slider("Refrigerant reclaimed per unit (%) (field/EoL)", 0, 100, 0)
-        d_volume = st.number_input("Unit volume (cu.ft)", 1.0, 80.0, 12.0, 0.5)
-        d_usa = st.checkbox("Manufactured in USA?")
-        d_leakdet = st.checkbox("Leak detectors present?")
-        d_safety = st.selectbox("Refrigerant safety class", ["1", "2L", "2", "3"])
-
-    # Indirect CF inputs
-    st.subheader("Indirect CF Features")
-    i_comp = st.selectbox("Compressor type", ["1-stg", "2-stg", "variable"])
-    i_df = st.checkbox("Demand flexibility (DR) available?")
-    i_ct = st.checkbox("Connected/smart thermostat?")
+    model_fragment(lifetime, grid, refrigerant_gwp, embodied_factor)
+
+    st.markdown("---")
+    st.caption("Run locally: Streamlit is free on your machine. Only the hosted service costs money.")
+
+
+# inputs + results rerun on their own; only sidebar changes rerun the whole page
+@st.fragment
+def model_fragment(lifetime: int,
+                   grid: float,
+                   refrigerant_gwp: float,
+                   embodied_factor: float):
+    # widget edits are batched until Compute is pressed
+    with st.form("inputs"):
+        col1, col2 = st.columns(2)
+
+        # System inputs
+        with col1:
+            st.subheader("System Inputs")
+            cap = st.number_input("System capacity (Btuh)", 9000.0, 120000.0, 36000.0, 500.0)
+            seer2 = st.number_input("SEER2", 8.0, 30.0, 15.0, 0.1)
+            hspf2 = st.number_input("HSPF2", 5.0, 14.0, 8.5, 0.1)
+            charge = st.number_input("Refrigerant charge (kg)", 0.5, 15.0, 3.0, 0.1)
+            reclaimed_init = st.slider("Reclaimed refrigerant at initial charge (%)", 0, 100, 0)
+            annual_leak = st.slider("Annual leakage rate (%)", 0, 30, 4)
+            eol_loss = st.slider("End-of-life refrigerant loss (%)", 0, 100, 85)
+            material_wt = st.number_input("Material weight of outdoor unit (kg)", 10.0, 350.0, 140.0, 1.0)
+
+        # Direct CF inputs
+        with col2:
+            st.subheader("Direct CF Features")
+            d_reclaimed = st.slider("Refrigerant reclaimed per unit (%) (field/EoL)", 0, 100, 0)
+            d_volume = st.number_input("Unit volume (cu.ft)", 1.0, 80.0, 12.0, 0.5)
+            d_usa = st.checkbox("Manufactured in USA?")
+            d_leakdet = st.checkbox("Leak detectors present?")
+            d_safety = st.selectbox("Refrigerant safety class", ["1", "2L", "2", "3"])
+
+        # Indirect CF inputs
+        st.subheader("Indirect CF Features")
+        i_comp = st.selectbox("Compressor type", ["1-stg", "2-stg", "variable"])
+        i_df = st.checkbox("Demand flexibility (DR) available?")
+        i_ct = st.checkbox("Connected/smart thermostat?")
+
+        submitted = st.form_submit_button("Compute")
+
+    if not submitted and "results" not in st.session_state:
+        st.info("Set the inputs and press **Compute** to run the model.")
+        return
 
     # Build objects
     system = SystemInputs(
@@ -211,18 +335,30 @@ def main():
         connected_thermostat=i_ct,
     )
 
-    # Baselines
-    base_direct = calc_baseline_direct(system,
-                                       refrigerant_gwp=refrigerant_gwp,
-                                       lifetime_years=lifetime,
-                                       embodied_factor=embodied_factor)
-    base_indirect = calc_baseline_indirect(system,
-                                            lifetime_years=lifetime,
-                                            grid_factor=grid)
-
-    # CFs
-    direct_cf_mult = build_direct_cf(d_cf_inputs)
-    indirect_cf_mult = build_indirect_cf(i_cf_inputs)
+    # last results are kept in session state, keyed on everything they
+    # depend on, so fragment reruns that change nothing skip the compute
+    key = (system, d_cf_inputs, i_cf_inputs,
+           lifetime, grid, refrigerant_gwp, embodied_factor)
+    if st.session_state.get("results", (None,))[0] != key:
+        # Baselines
+        base_direct = calc_baseline_direct(system,
+                                           refrigerant_gwp=refrigerant_gwp,
+                                           lifetime_years=lifetime,
+                                           embodied_factor=embodied_factor)
+        base_indirect = calc_baseline_indirect(system,
+                                                lifetime_years=lifetime,
+                                                grid_factor=grid)
+
+        # CFs
+        direct_cf_mult = build_direct_cf(d_cf_inputs)
+        indirect_cf_mult = build_indirect_cf(i_cf_inputs)
+
+        st.session_state["results"] = (
+            key, (base_direct, base_indirect, direct_cf_mult, indirect_cf_mult)
+        )
+
+    _, (base_direct, base_indirect,
+        direct_cf_mult, indirect_cf_mult) = st.session_state["results"]
 
     adj_direct = base_direct * direct_cf_mult
     adj_indirect = base_indirect * indirect_cf_mult
@@ -243,71 +379,43 @@ def main():
     # CHART
     # ----------------------------
     st.subheader("Emission Breakdown (kgCO2e)")
-    chart_df = pd.DataFrame(
-        {
-            "label": [
-                "Baseline Direct",
-                "Adjusted Direct",
-                "Baseline Indirect",
-                "Adjusted Indirect",
-                "Total LCCP",
-            ],
-            "kgCO2e": [
-                base_direct,
-                adj_direct,
-                base_indirect,
-                adj_indirect,
-                total_lccp,
-            ],
-        }
-    )
-    st.bar_chart(chart_df.set_index("label"))
+    st.vega_lite_chart(_build_chart(base_direct, adj_direct,
+                                    base_indirect, adj_indirect, total_lccp))
+
+    # ----------------------------
+    # SENSITIVITY
+    # ----------------------------
+    st.subheader("Sensitivity (Total LCCP, kgCO2e)")
+    s1, s2 = st.columns(2)
+    with s1:
+        st.caption("vs. grid emission factor")
+        st.line_chart(_build_grid_sweep_df(system, lifetime,
+                                           adj_direct, indirect_cf_mult))
+    with s2:
+        st.caption("vs. annual leakage rate")
+        st.line_chart(_build_leak_sweep_df(system, refrigerant_gwp, lifetime,
+                                           embodied_factor, adj_indirect,
+                                           direct_cf_mult))
 
     # ----------------------------
     # CSV EXPORT
     # ----------------------------
     st.subheader("Export Results")
-    export_df = pd.DataFrame(
-        {
-            "metric": [
-                "capacity_btuh",
-                "seer2",
-                "hspf2",
-                "refrigerant_charge_kg",
-                "baseline_direct_kgco2e",
-                "adjusted_direct_kgco2e",
-                "baseline_indirect_kgco2e",
-                "adjusted_indirect_kgco2e",
-                "total_lccp_kgco2e",
-                "direct_cf_multiplier",
-                "indirect_cf_multiplier",
-            ],
-            "value": [
-                cap,
-                seer2,
-                hspf2,
-                charge,
-                base_direct,
-                adj_direct,
-                base_indirect,
-                adj_indirect,
-                total_lccp,
-                direct_cf_mult,
-                indirect_cf_mult,
-            ],
-        }
-    )
 
-    csv_bytes = export_df.to_csv(index=False).encode("utf-8")
+    # only encoded when the button is actually clicked
+    def _get_csv() -> bytes:
+        return _build_csv(cap, seer2, hspf2, charge,
+                          base_direct, adj_direct,
+                          base_indirect, adj_indirect, total_lccp,
+                          direct_cf_mult, indirect_cf_mult)
+
     st.download_button(
         label="Download CSV of this run",
-        data=csv_bytes,
+        data=_get_csv,
         file_name="lccp_results.csv",
         mime="text/csv",
     )
 
-    st.markdown("---")
-    st.caption("Run locally: Streamlit is free on your machine. Only the hosted service costs money.")
 
 if __name__ == "__main__":
     main()
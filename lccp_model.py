@@ -0,0 +1,169 @@
+# Numeric core of the LCCP model. Streamlit re-executes lccp_app.py on
+# every full rerun, so anything that should be built only once per process
+# (compiled kernels, correction-factor tables) lives here; Python imports
+# it once and keeps it in sys.modules.
+from itertools import product
+
+from numba import vectorize
+
+# ----------------------------
+# CONSTANTS
+# ----------------------------
+DEFAULT_COOLING_HOURS = 1000
+DEFAULT_HEATING_HOURS = 600
+
+# operating hours per 1000 (Btu -> kBtu), folded in once at import
+COOL_H_PER_K = DEFAULT_COOLING_HOURS / 1000.0
+HEAT_H_PER_K = DEFAULT_HEATING_HOURS / 1000.0
+
+
+# ----------------------------
+# KERNELS
+# ----------------------------
+# the single definition of each formula: numba ufuncs, so the same kernel
+# serves one scenario (scalars) and whole sweeps (broadcast arrays).
+# Compiled eagerly for float64 when this module is first imported and
+# cached on disk by numba.
+@vectorize(["float64(float64, float64, float64, float64, float64, float64, float64, float64)"],
+           cache=True)
+def calc_direct_kernel(charge, leak_pct, eol_pct, reclaimed_pct,
+                       mat_wt, gwp, lifetime, embodied):
+    annual_leak_frac = leak_pct / 100.0
+    eol_loss_frac = eol_pct / 100.0
+
+    # annual/leak
+    annual_leak_kg = charge * annual_leak_frac
+    total_leak_kg = annual_leak_kg * lifetime
+
+    remaining_kg = max(charge - total_leak_kg, 0.0)
+    eol_leak_kg = remaining_kg * eol_loss_frac
+
+    refrigerant_emissions = (total_leak_kg + eol_leak_kg) * gwp
+
+    # credit for reclaimed refrigerant used at initial charge
+    reclaimed_frac = reclaimed_pct / 100.0
+    reclaimed_credit = charge * reclaimed_frac * gwp * (-0.5)
+
+    # embodied for outdoor unit
+    embodied_kg = mat_wt * embodied
+
+    return refrigerant_emissions + reclaimed_credit + embodied_kg
+
+
+@vectorize(["float64(float64, float64, float64, float64, float64)"], cache=True)
+def calc_indirect_kernel(cap, seer2, hspf2, lifetime, grid_factor):
+    cooling_kwh = cap * COOL_H_PER_K / seer2
+    heating_kwh = cap * HEAT_H_PER_K / hspf2
+
+    annual_kwh = cooling_kwh + heating_kwh
+    annual_kgco2 = annual_kwh * grid_factor
+    return annual_kgco2 * lifetime
+
+
+# ----------------------------
+# CORRECTION FACTORS
+# ----------------------------
+# keys are exactly what the selectboxes emit
+_SAFETY_MULT = {"1": 1.0, "2L": 0.995, "2": 1.0, "3": 1.01}
+_COMPRESSOR_MULT = {"1-stg": 1.0, "2-stg": 0.95, "variable": 0.90}
+
+
+def _bin_reclaimed(pct: float) -> int:
+    if pct >= 50:
+        return 2
+    elif pct >= 20:
+        return 1
+    return 0
+
+
+def _bin_volume(cuft: float) -> int:
+    if cuft <= 6:
+        return 0
+    elif cuft <= 10:
+        return 1
+    return 2
+
+
+def _direct_cf_value(reclaimed_bin: int,
+                     volume_bin: int,
+                     usa: bool,
+                     leakdet: bool,
+                     safety: str) -> float:
+    cf_val = 1.0
+
+    # reclaimed per unit
+    if reclaimed_bin == 2:
+        cf_val *= 0.9
+    elif reclaimed_bin == 1:
+        cf_val *= 0.95
+
+    # unit volume
+    if volume_bin == 0:
+        cf_val *= 0.97
+    elif volume_bin == 1:
+        cf_val *= 0.99
+
+    # manufactured in USA
+    if usa:
+        cf_val *= 0.98
+
+    # leak detectors
+    if leakdet:
+        cf_val *= 0.95
+
+    # refrigerant safety
+    cf_val *= _SAFETY_MULT.get(safety, 1.0)
+
+    return cf_val
+
+
+def _indirect_cf_value(compressor: str,
+                       demand_flex: bool,
+                       connected_thermostat: bool) -> float:
+    cf_val = _COMPRESSOR_MULT.get(compressor, 1.0)
+
+    if demand_flex:
+        cf_val *= 0.97
+
+    if connected_thermostat:
+        cf_val *= 0.98
+
+    return cf_val
+
+
+# the CFs only depend on a small discrete feature space, so every
+# combination is evaluated once, when this module is first imported,
+# and looked up afterwards
+_DIRECT_TABLE: dict[tuple, float] = {
+    key: _direct_cf_value(*key)
+    for key in product((0, 1, 2), (0, 1, 2), (False, True), (False, True), _SAFETY_MULT)
+}
+
+_INDIRECT_TABLE: dict[tuple, float] = {
+    key: _indirect_cf_value(*key)
+    for key in product(_COMPRESSOR_MULT, (False, True), (False, True))
+}
+
+
+def direct_cf(reclaimed_pct: float,
+              volume_cuft: float,
+              usa: bool,
+              leakdet: bool,
+              safety: str) -> float:
+    key = (_bin_reclaimed(reclaimed_pct),
+           _bin_volume(volume_cuft),
+           bool(usa),
+           bool(leakdet),
+           safety)
+    cf_val = _DIRECT_TABLE.get(key)
+    return cf_val if cf_val is not None else _direct_cf_value(*key)
+
+
+def indirect_cf(compressor_type: str,
+                demand_flex: bool,
+                connected_thermostat: bool) -> float:
+    key = (compressor_type,
+           bool(demand_flex),
+           bool(connected_thermostat))
+    cf_val = _INDIRECT_TABLE.get(key)
+    return cf_val if cf_val is not None else _indirect_cf_value(*key)
@@ -0,0 +1,42 @@
+# The app's caches must stay in memory: Streamlit keys persisted entries on
+# the wrapper's own source only, so a disk cache would keep serving old
+# numbers after a change to the formulas in lccp_model, and max_entries
+# never removes the files it writes.
+import pytest
+from streamlit.runtime.caching import cache_data_api
+from streamlit.runtime.caching.storage.local_disk_cache_storage import (
+    LocalDiskCacheStorageManager,
+)
+
+import lccp_app
+
+
+@pytest.fixture
+def disk_cache_home(tmp_path, monkeypatch):
+    # outside a running app Streamlit falls back to in-memory storage, so
+    # install the disk-backed manager a real runtime uses, under a temp HOME
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(cache_data_api._data_caches, "_function_caches", {})
+    monkeypatch.setattr(cache_data_api._data_caches, "get_storage_manager",
+                        LocalDiskCacheStorageManager)
+    return tmp_path
+
+
+def _disk_cache_files(home):
+    cache_dir = home / ".streamlit" / "cache"
+    return list(cache_dir.iterdir()) if cache_dir.exists() else []
+
+
+def test_calcs_are_not_persisted_to_disk(disk_cache_home):
+    lccp_app._calc_direct(3.0, 4, 85, 0, 140.0, 675.0, 15, 5.0)
+    lccp_app._calc_indirect(36000.0, 15.0, 8.5, 15, 0.38)
+
+    assert _disk_cache_files(disk_cache_home) == []
+
+
+def test_csv_export_is_not_persisted_to_disk(disk_cache_home):
+    lccp_app._build_csv(36000.0, 15.0, 8.5, 3.0,
+                        2603.5, 2603.5, 28164.7, 28164.7, 30768.2,
+                        1.0, 1.0)
+
+    assert _disk_cache_files(disk_cache_home) == []
@@ -0,0 +1,79 @@
+# Keeps the scalar and sweep (broadcast) uses of the kernels in agreement
+# with each other and with the plain-Python baseline formulas.
+import itertools
+
+import numpy as np
+import pytest
+
+from lccp_model import (
+    DEFAULT_COOLING_HOURS,
+    DEFAULT_HEATING_HOURS,
+    calc_direct_kernel,
+    calc_indirect_kernel,
+)
+
+
+def _direct_reference(charge, leak_pct, eol_pct, reclaimed_pct,
+                      mat_wt, gwp, lifetime, embodied):
+    total_leak_kg = charge * leak_pct / 100.0 * lifetime
+    eol_leak_kg = max(charge - total_leak_kg, 0) * eol_pct / 100.0
+    reclaimed_credit = charge * reclaimed_pct / 100.0 * gwp * (-0.5)
+    return (total_leak_kg + eol_leak_kg) * gwp + reclaimed_credit + mat_wt * embodied
+
+
+def _indirect_reference(cap, seer2, hspf2, lifetime, grid_factor):
+    cooling_kwh = (cap * DEFAULT_COOLING_HOURS) / (seer2 * 1000.0)
+    heating_kwh = (cap * DEFAULT_HEATING_HOURS) / (hspf2 * 1000.0)
+    return (cooling_kwh + heating_kwh) * grid_factor * lifetime
+
+
+# includes leak * lifetime > 100 %, which exercises the max(..., 0) clamp
+DIRECT_CASES = list(itertools.product(
+    [0.5, 3.0, 15.0],    # charge
+    [0.0, 4.0, 30.0],    # leak_pct
+    [0.0, 85.0],         # eol_pct
+    [0.0, 50.0],         # reclaimed_pct
+    [140.0],             # mat_wt
+    [1.0, 675.0],        # gwp
+    [10.0, 25.0],        # lifetime
+    [5.0],               # embodied
+))
+
+INDIRECT_CASES = list(itertools.product(
+    [9000.0, 36000.0],   # cap
+    [8.0, 15.0],         # seer2
+    [5.0, 8.5],          # hspf2
+    [10.0, 25.0],        # lifetime
+    [0.1, 0.38, 1.5],    # grid_factor
+))
+
+
+def test_direct_scalar_matches_reference():
+    for args in DIRECT_CASES:
+        assert calc_direct_kernel(*args) == pytest.approx(_direct_reference(*args))
+
+
+def test_indirect_scalar_matches_reference():
+    for args in INDIRECT_CASES:
+        assert calc_indirect_kernel(*args) == pytest.approx(_indirect_reference(*args))
+
+
+def test_direct_broadcast_matches_scalar():
+    columns = [np.array(col) for col in zip(*DIRECT_CASES)]
+    swept = calc_direct_kernel(*columns)
+    assert swept == pytest.approx([calc_direct_kernel(*args) for args in DIRECT_CASES])
+
+
+def test_indirect_broadcast_matches_scalar():
+    columns = [np.array(col) for col in zip(*INDIRECT_CASES)]
+    swept = calc_indirect_kernel(*columns)
+    assert swept == pytest.approx([calc_indirect_kernel(*args) for args in INDIRECT_CASES])
+
+
+def test_scalar_args_broadcast_against_sweep():
+    leak = np.arange(0.0, 31.0)
+    swept = calc_direct_kernel(3.0, leak, 85.0, 0.0, 140.0, 675.0, 15, 5.0)
+    assert swept.shape == leak.shape
+    assert swept == pytest.approx(
+        [_direct_reference(3.0, x, 85.0, 0.0, 140.0, 675.0, 15, 5.0) for x in leak]
+    )